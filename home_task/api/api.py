@@ -1,15 +1,34 @@
-from typing import Optional
-from fastapi import FastAPI, HTTPException
+import logging
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from home_task.db import get_session
+from sqlalchemy import bindparam, select
+from sqlalchemy.exc import SQLAlchemyError
+from home_task.db import pg_session_factory
 from home_task.models import JobPostingStats
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title="Days to Hire Stats API",
     description="API for retrieving days to hire stats.",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serializes responses considerably faster than the stdlib json encoder.
+    default_response_class=ORJSONResponse
 )
 
+
+@app.exception_handler(SQLAlchemyError)
+async def database_error_handler(request: Request, exc: SQLAlchemyError) -> ORJSONResponse:
+    """Turn database errors into a generic 500, without leaking SQL details to the client."""
+    # The exception counts as handled, so log it here - otherwise the traceback never reaches the server logs.
+    logger.exception("Database error while handling %s", request.url.path, exc_info=exc)
+    return ORJSONResponse({"detail": "Internal server error."}, status_code=500)
+
+
 class DaysToHireStats(BaseModel):
     """Response model for days to hire stats."""
     standard_job_id: str
@@ -21,52 +40,68 @@ class DaysToHireStats(BaseModel):
     job_postings_number: Optional[int] = None
 
 
+# Built once at import, so SQLAlchemy can reuse the compiled statement instead of building a query per request.
+# Only the response columns are selected, so rows come back as plain tuples without building ORM objects.
+STATS_QUERY = select(
+    JobPostingStats.standard_job_id,
+    JobPostingStats.country_code,
+    JobPostingStats.min_days,
+    JobPostingStats.avg_days,
+    JobPostingStats.max_days,
+    JobPostingStats.job_postings_number,
+).where(
+    JobPostingStats.standard_job_id == bindparam("standard_job_id"),
+    JobPostingStats.country_code == bindparam("country_code"),
+)
+
+# Stats only change when the CLI script is re-run, so lookups are cached in-process.
+# Entries expire after at most this many seconds, which bounds how stale a response can get after a CLI run.
+# The expiry is a fixed time bucket shared by all entries, so the whole cache misses at once at each boundary.
+STATS_CACHE_TTL_SECONDS = 3600
+
+
+@lru_cache(maxsize=4096)
+def _lookup_stats(standard_job_id: str, country_code: str, ttl_bucket: int) -> Dict[str, Any]:
+    """
+    Get the stats for a specific standard job and country as a plain dict.
+    `ttl_bucket` is not used in the query - it changes every STATS_CACHE_TTL_SECONDS to expire cached entries.
+    Misses are not cached: the 404 is raised as an exception, which lru_cache does not store,
+    so stats created by a later CLI run are visible straight away.
+    """
+    with pg_session_factory() as session:
+        # The unique index on (standard_job_id, country_code) guarantees at most one row.
+        row = session.execute(STATS_QUERY, {
+            "standard_job_id": standard_job_id,
+            "country_code": country_code,
+        }).one_or_none()
+
+    if row is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No statistics found for standard_job_id {standard_job_id} and country_code {country_code}. "
+        )
+
+    # Column names match the DaysToHireStats fields.
+    return row._asdict()
+
+
 @app.get("/stats/days-to-hire", response_model=DaysToHireStats)
 async def get_days_to_hire_stats(
     standard_job_id: str,
-    country_code: Optional[str] = None
+    # The CLI script stores world stats under "World", so that is what we look up when no country is given.
+    country_code: str = Query(default="World")
 ):
-    session = get_session()
-    
-    try:
-        # Get the stats for the specified ID.
-        query = session.query(JobPostingStats).filter(
-            JobPostingStats.standard_job_id == standard_job_id
-        )
-        
-        # We already modified the country_code to "World" in the CLI script.
-        if country_code is not None:
-            query = query.filter(JobPostingStats.country_code == country_code)
-        else:
-            query = query.filter(JobPostingStats.country_code == "World")
-        
-        # Use first() to get one record (in case of duplicates).
-        stats = query.first()
-        
-        if not stats:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No statistics found for standard_job_id {standard_job_id} and country_code {country_code if country_code else 'World'}. "
-            )
-        
-        return DaysToHireStats(
-            standard_job_id=stats.standard_job_id,
-            country_code=stats.country_code,
-            min_days=stats.min_days,
-            avg_days=stats.avg_days,
-            max_days=stats.max_days,
-            job_postings_number=stats.job_postings_number
-        )
+    # Get the stats for the specified ID.
+    # Database errors are handled by database_error_handler, missing stats raise a 404 from _lookup_stats.
+    stats = _lookup_stats(
+        standard_job_id,
+        country_code,
+        int(time.monotonic() // STATS_CACHE_TTL_SECONDS),
+    )
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Internal server error: {str(e)}"
-        )
-    finally:
-        session.close()
+    # The values come straight from typed columns and FastAPI validates the response model anyway,
+    # so skip the redundant validation here.
+    return DaysToHireStats.construct(**stats)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,13 +1,17 @@
+import uuid
 from dataclasses import dataclass
 from typing import Optional
 
 from sqlalchemy import (
     Column,
+    Index,
     Integer,
     String,
     Table,
     Float,
+    text,
 )
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import registry
 
 mapper_registry = registry()
@@ -60,6 +64,13 @@ class JobPosting(Model):
         Column("standard_job_id", String, nullable=False),
         Column("country_code", String, nullable=True),
         Column("days_to_hire", Integer, nullable=True),
+        # Covers the CLI's per standard job / country filters without touching the heap.
+        Index(
+            "ix_job_posting_standard_job_id_country_code",
+            "standard_job_id",
+            "country_code",
+            postgresql_include=["days_to_hire"],
+        ),
         schema="public",
     )
 
@@ -75,18 +86,26 @@ class JobPostingStats(Model):
     __table__ = Table(
         "job_posting_stats",
         mapper_registry.metadata,
-        Column("id", String, nullable=False, primary_key=True),
+        # Generated by Postgres (built-in since 13), stored as a native 16-byte uuid.
+        Column("id", UUID(as_uuid=True), nullable=False, primary_key=True, server_default=text("gen_random_uuid()")),
         Column("standard_job_id", String, nullable=False),
         Column("country_code", String, nullable=True),
         Column("min_days", Float, nullable=True),
         Column("avg_days", Float, nullable=True),
         Column("max_days", Float, nullable=True),
         Column("job_postings_number", Integer, nullable=True),
+        # One row per standard job and country; also the conflict target when upserting stats.
+        Index(
+            "ix_job_posting_stats_standard_job_id_country_code",
+            "standard_job_id",
+            "country_code",
+            unique=True,
+        ),
         schema="public",
     )
 
-    id: str
     standard_job_id: str
+    id: Optional[uuid.UUID] = None
     country_code: Optional[str] = None
     min_days: Optional[float] = None
     avg_days: Optional[float] = None
@@ -0,0 +1,41 @@
+"""Index job posting by standard job and country
+
+Revision ID: b7e04d1c9a52
+Revises: 3c2f7a9d41e6
+Create Date: 2026-10-15 11:02:47.915364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e04d1c9a52'
+down_revision = '3c2f7a9d41e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # job_posting holds millions of rows, so build the index without blocking writes.
+    # CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_job_posting_standard_job_id_country_code',
+            'job_posting',
+            ['standard_job_id', 'country_code'],
+            unique=False,
+            schema='public',
+            postgresql_include=['days_to_hire'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_job_posting_standard_job_id_country_code',
+            table_name='job_posting',
+            schema='public',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,38 @@
+"""Generate job posting stats ids in the database
+
+Revision ID: e5a19c07f3b8
+Revises: b7e04d1c9a52
+Create Date: 2026-10-15 11:48:09.270531
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a19c07f3b8'
+down_revision = 'b7e04d1c9a52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing ids were written as str(uuid.uuid4()), so they cast cleanly.
+    op.alter_column('job_posting_stats', 'id',
+               existing_type=sa.String(),
+               type_=postgresql.UUID(as_uuid=True),
+               existing_nullable=False,
+               server_default=sa.text('gen_random_uuid()'),
+               postgresql_using='id::uuid',
+               schema='public')
+
+
+def downgrade() -> None:
+    op.alter_column('job_posting_stats', 'id',
+               existing_type=postgresql.UUID(as_uuid=True),
+               type_=sa.String(),
+               existing_nullable=False,
+               server_default=None,
+               postgresql_using='id::text',
+               schema='public')